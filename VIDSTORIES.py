@@ -1,5 +1,6 @@
 import os
 import threading
+import queue
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog, scrolledtext
 from PIL import Image, ImageTk
@@ -13,12 +14,26 @@ import uuid
 import re
 import json
 import datetime
+import sys
+import time
+import socket
+import hashlib
 from openai import OpenAI
 
 
 # Initialize OpenAI API
 client = OpenAI(api_key=os.environ.get('OPENAI_API_KEY'))
 
+# Spool directory shared by the GUI (client) and any number of worker processes
+QUEUE_DIR = os.path.join('PROJECTS', 'QUEUE')
+QUEUE_STATES = ['pending', 'claimed', 'done', 'failed']
+JOB_LEASE_SECONDS = 120
+JOB_MAX_ATTEMPTS = 3
+
+# Content-addressed store: every asset is kept once, keyed by its SHA-256, and hardlinked where it is used
+BLOBS_DIR = 'BLOBS'
+MANIFEST_FILE = 'manifest.json'
+
 class MainGUI:
     def __init__(self, master):
         self.master = master
@@ -40,7 +55,6 @@ class MainGUI:
         self.audio_files = []
         self.voice_counters = {'Voice 1': 1, 'Voice 2': 1}
         self.playing_audio = None
-        self.stop_playback = threading.Event()
 
         self.create_necessary_folders()
         self.load_settings()
@@ -67,9 +81,11 @@ class MainGUI:
             return "Custom persona file not found. Using default."
 
     def create_necessary_folders(self):
-        folders = ['AUDIO', 'IMAGES', 'PROJECTS', 'DIALOGS', 'BACKUPS']
+        folders = ['AUDIO', 'IMAGES', 'PROJECTS', 'DIALOGS', 'BACKUPS', BLOBS_DIR]
         for folder in folders:
             os.makedirs(folder, exist_ok=True)
+        for state in QUEUE_STATES:
+            os.makedirs(os.path.join(QUEUE_DIR, state), exist_ok=True)
 
     def update_setting(self, voice, param, value):
         param_key = param.lower().replace(' ', '_')
@@ -133,8 +149,11 @@ class MainGUI:
         self.story_input_text = scrolledtext.ScrolledText(self.story_tab, height=5)
         self.story_input_text.pack(pady=5, padx=10, fill=tk.X)
 
-        # Generate button
-        ttk.Button(self.story_tab, text="Generate", command=self.generate_content).pack(pady=10)
+        # Generate buttons
+        button_frame = ttk.Frame(self.story_tab)
+        button_frame.pack(pady=10)
+        ttk.Button(button_frame, text="Generate", command=self.generate_content).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Queue for Workers", command=self.queue_content).pack(side=tk.LEFT, padx=5)
 
         # Output area
         ttk.Label(self.story_tab, text="Generated Content:").pack(pady=5)
@@ -230,6 +249,7 @@ class MainGUI:
         ttk.Radiobutton(voice_button_frame, text="Voice 2", variable=self.active_voice, value="Voice 2").pack(side=tk.LEFT, padx=5)
         ttk.Button(voice_button_frame, text="Test", command=self.test_voice).pack(side=tk.LEFT, padx=5)
         ttk.Button(voice_button_frame, text="Save", command=self.save_voice).pack(side=tk.LEFT, padx=5)
+        ttk.Button(voice_button_frame, text="Queue Save", command=self.queue_voice).pack(side=tk.LEFT, padx=5)
 
         # Progress bar and label
         progress_frame = ttk.Frame(main_frame)
@@ -284,7 +304,6 @@ class MainGUI:
         selection = self.file_tree.selection()
         if selection:
             file_path = self.audio_files[self.file_tree.index(selection[0])]
-            self.stop_playback.clear()
             threading.Thread(target=self._play_audio, args=(file_path,)).start()
 
     def _play_audio(self, file_path):
@@ -296,7 +315,7 @@ class MainGUI:
 
     def stop_audio(self):
         if self.playing_audio:
-            self.stop_playback.set()
+            self.playing_audio.set()
             self.playing_audio = None
 
     def open_file_location(self):
@@ -329,7 +348,8 @@ class MainGUI:
             new_path = filedialog.asksaveasfilename(defaultextension=".mp3", initialfile=os.path.basename(file_path))
             if new_path:
                 try:
-                    shutil.copy(file_path, new_path)
+                    # A user export may be edited in place, so it must never share bytes with the store
+                    shutil.copy2(file_path, new_path)
                     self.audio_files.append(new_path)
                     self.update_file_list()
                 except Exception as e:
@@ -412,7 +432,10 @@ class MainGUI:
     def save_voice(self):
         self.process_voice(is_test=False)
 
-    def process_voice(self, is_test):
+    def queue_voice(self):
+        self.process_voice(is_test=False, queued=True)
+
+    def process_voice(self, is_test, queued=False):
         try:
             sel_start = self.text_input.index(tk.SEL_FIRST)
             sel_end = self.text_input.index(tk.SEL_LAST)
@@ -430,7 +453,10 @@ class MainGUI:
         
         voice = self.active_voice.get()
         params = self.get_voice_params(voice)
-        if is_test:
+        if queued:
+            job_id = submit_job('voice', {'text': selected_text, 'voice': voice, 'params': params})
+            self.watch_job(job_id, self.on_voice_job_finished)
+        elif is_test:
             threading.Thread(target=self._generate_and_play, args=(selected_text, voice, sel_start, sel_end), kwargs=params).start()
         else:
             threading.Thread(target=self._generate_and_save, args=(selected_text, voice, sel_start, sel_end), kwargs=params).start()
@@ -440,14 +466,38 @@ class MainGUI:
                 for param in ["pitch", "speed", "low_pass", "high_pass", "bass_boost", "formant_shift"]}
 
     def _generate_and_play(self, text, voice, sel_start, sel_end, **params):
+        # Play each chunk as soon as it is synthesized while later chunks are still being generated
+        playback_buffer = queue.Queue()
+        stop_event = threading.Event()
+        errors = []
+
+        def synthesize():
+            try:
+                for audio_segment in generate_audio_chunks(text, voice, progress_callback=self.update_progress, **params):
+                    if stop_event.is_set():
+                        break
+                    playback_buffer.put(audio_segment)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                playback_buffer.put(None)
+
+        self.playing_audio = stop_event
+        threading.Thread(target=synthesize, daemon=True).start()
         try:
-            audio_path = generate_audio(text, voice, progress_callback=self.update_progress, **params)
-            sound = AudioSegment.from_mp3(audio_path)
-            play(sound)
-            os.remove(audio_path)
+            while True:
+                audio_segment = playback_buffer.get()
+                if audio_segment is None or stop_event.is_set():
+                    break
+                play(audio_segment)
+            if errors:
+                raise errors[0]
         except Exception as e:
             messagebox.showerror("Error", f"Failed to generate or play audio: {str(e)}")
         finally:
+            stop_event.set()
+            if self.playing_audio is stop_event:
+                self.playing_audio = None
             self.restore_selection(sel_start, sel_end)
             self.reset_progress()
 
@@ -456,7 +506,7 @@ class MainGUI:
             audio_path = generate_audio(text, voice, progress_callback=self.update_progress, **params)
             base_filename = f"{voice}_AUDIO_{self.voice_counters[voice]:05d}.mp3"
             save_path = self.get_unique_filename(os.path.join("DIALOGS", base_filename))
-            shutil.move(audio_path, save_path)
+            store_asset(audio_path, keep=False, link_to=save_path)
             self.audio_files.append(save_path)
             self.master.after(0, self.update_file_list)
             self.voice_counters[voice] += 1
@@ -514,38 +564,60 @@ class MainGUI:
 
             self.master.after(0, lambda: self.output_text.insert(tk.END, content))
 
-            # Create project directory
-            story_title = content.split('.')[0][:50].strip().replace(' ', '_')
-            project_dir = os.path.join('PROJECTS', story_title)
-            os.makedirs(project_dir, exist_ok=True)
-
-            # Generate images and audio for the content
-            self.update_progress(30)
-            image_prompts = content.split(". ")
-            image_paths = []
-            for prompt in image_prompts:
-                if prompt:
-                    image_path = generate_image(prompt)
-                    if image_path:
-                        image_paths.append(image_path)
-
-            self.master.after(0, lambda: self.display_thumbnails(image_paths))
-
-            self.update_progress(50)
-            audio_path = generate_audio(content, voice, progress_callback=self.update_progress)
-            self.master.after(0, lambda: self.output_text.insert(tk.END, f"\n\nAudio generated: {audio_path}"))
-
-            # Move audio file to project directory
-            shutil.move(audio_path, os.path.join(project_dir, os.path.basename(audio_path)))
-
-            # Compile video
-            self.update_progress(70)
-            self.compile_video(image_paths, os.path.join(project_dir, os.path.basename(audio_path)), project_dir)
+            def on_images(image_paths):
+                self.master.after(0, lambda: self.display_thumbnails(image_paths))
+
+            def on_audio(audio_path):
+                self.master.after(0, lambda: self.output_text.insert(tk.END, f"\n\nAudio generated: {audio_path}"))
+
+            output_path = build_project(content, voice, progress_callback=self.update_progress,
+                                        images_callback=on_images, audio_callback=on_audio)
+            self.master.after(0, lambda: self.output_text.insert(tk.END, f"\n\nVideo created at: {output_path}"))
             self.update_progress(100)
 
         except Exception as e:
             self.master.after(0, lambda: messagebox.showerror("Error", f"An error occurred: {str(e)}"))
 
+    def queue_content(self):
+        model_name = self.model_var.get()
+        context = self.story_input_text.get("1.0", tk.END).strip()
+        persona = self.personas[self.persona_var.get()]
+        voice = self.voice_var.get()
+
+        if not context:
+            messagebox.showwarning("Input Required", "Please enter a story concept.")
+            return
+
+        job_id = submit_job('story', {'model_name': model_name, 'context': context, 'persona': persona, 'voice': voice})
+        self.output_text.insert(tk.END, f"Queued story job {job_id}. Start workers with: python VIDSTORIES.py --worker\n")
+        self.watch_job(job_id, self.on_story_job_finished)
+
+    def on_story_job_finished(self, job_id, state, job):
+        if state == 'done':
+            self.output_text.insert(tk.END, f"\nJob {job_id} finished: {job.get('result')}\n")
+        else:
+            self.output_text.insert(tk.END, f"\nJob {job_id} failed: {job.get('error')}\n")
+
+    def on_voice_job_finished(self, job_id, state, job):
+        if state == 'done':
+            self.audio_files.append(job['result'])
+            self.update_file_list()
+            messagebox.showinfo("Success", f"Audio saved as {os.path.basename(job['result'])}")
+        else:
+            messagebox.showerror("Error", f"Queued voice job {job_id} failed: {job.get('error')}")
+
+    def watch_job(self, job_id, on_finished, misses=0):
+        state, job = get_job_status(job_id)
+        if state in ('done', 'failed'):
+            on_finished(job_id, state, job)
+            return
+        # A job is briefly in no folder while it moves between states, so only give up after repeated misses
+        misses = misses + 1 if state is None else 0
+        if misses > 30:
+            on_finished(job_id, 'failed', {'error': "job file disappeared from the queue"})
+            return
+        self.master.after(2000, lambda: self.watch_job(job_id, on_finished, misses))
+
     def display_thumbnails(self, image_paths):
         for widget in self.filmstrip_frame.winfo_children():
             widget.destroy()
@@ -558,18 +630,6 @@ class MainGUI:
             thumbnail.image = img
             thumbnail.pack(side=tk.LEFT, padx=5)
 
-    def compile_video(self, image_paths, audio_path, project_dir):
-        try:
-            audio = AudioFileClip(audio_path)
-            total_duration = audio.duration
-            image_duration = total_duration / len(image_paths)
-            clip = ImageSequenceClip(image_paths, durations=[image_duration] * len(image_paths))
-            output_path = os.path.join(project_dir, f"final_video_{os.path.basename(project_dir)}.mp4")
-            clip.set_fps(24).set_audio(audio).write_videofile(output_path, codec='libx264', audio_codec='aac')
-            self.master.after(0, lambda: self.output_text.insert(tk.END, f"\n\nVideo created at: {output_path}"))
-        except Exception as e:
-            self.master.after(0, lambda: messagebox.showerror("Error", f"Failed to compile video: {str(e)}"))
-
     def show_file_context_menu(self, event):
         item = self.file_tree.identify_row(event.y)
         if item:
@@ -583,6 +643,380 @@ class MainGUI:
             context_menu.post(event.x_root, event.y_root)
 
 
+def build_project(content, voice, progress_callback=None, images_callback=None, audio_callback=None):
+    # Create project directory
+    story_title = content.split('.')[0][:50].strip().replace(' ', '_')
+    project_dir = os.path.join('PROJECTS', story_title)
+    os.makedirs(project_dir, exist_ok=True)
+
+    # Generate images and audio for the content
+    if progress_callback:
+        progress_callback(30)
+    image_prompts = content.split(". ")
+    image_paths = []
+    for prompt in image_prompts:
+        if prompt:
+            image_path = generate_image(prompt)
+            if image_path:
+                image_paths.append(add_project_asset(project_dir, image_path))
+
+    if images_callback:
+        images_callback(image_paths)
+
+    if progress_callback:
+        progress_callback(50)
+    audio_path = generate_audio(content, voice, progress_callback=progress_callback)
+    if audio_callback:
+        audio_callback(audio_path)
+
+    # Move audio file to project directory
+    project_audio_path = add_project_asset(project_dir, audio_path, keep=False)
+
+    # Compile video
+    if progress_callback:
+        progress_callback(70)
+    return compile_video(image_paths, project_audio_path, project_dir)
+
+def compile_video(image_paths, audio_path, project_dir):
+    audio = AudioFileClip(audio_path)
+    total_duration = audio.duration
+    image_duration = total_duration / len(image_paths)
+    clip = ImageSequenceClip(image_paths, durations=[image_duration] * len(image_paths))
+    # Never write over the previous render in place: it is a hardlink into the blob store
+    temp_path = os.path.join(project_dir, f"render_{uuid.uuid4()}.mp4")
+    try:
+        clip.set_fps(24).set_audio(audio).write_videofile(temp_path, codec='libx264', audio_codec='aac')
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return add_project_asset(project_dir, temp_path, keep=False,
+                             name=f"final_video_{os.path.basename(project_dir)}.mp4")
+
+def blob_path(blob_name):
+    return os.path.join(BLOBS_DIR, blob_name[:2], blob_name)
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def link_asset(source_path, dest_path):
+    if os.path.exists(dest_path) and os.path.samefile(source_path, dest_path):
+        return dest_path
+    temp_path = f"{dest_path}.{uuid.uuid4()}.tmp"
+    try:
+        os.link(source_path, temp_path)
+    except OSError:
+        # Hardlinks are not available across devices or on some shares; fall back to a real copy
+        shutil.copy2(source_path, temp_path)
+    os.replace(temp_path, dest_path)
+    return dest_path
+
+def store_asset(path, keep=True, link_to=None):
+    blob_name = hash_file(path) + os.path.splitext(path)[1].lower()
+    stored_path = blob_path(blob_name)
+    if not os.path.exists(stored_path):
+        os.makedirs(os.path.dirname(stored_path), exist_ok=True)
+        link_asset(path, stored_path)
+    if link_to:
+        # Link the destination before dropping the source so --gc never sees the blob unreferenced
+        link_asset(stored_path, link_to)
+    if keep:
+        # Point the original name at the shared blob so duplicate bytes are released
+        link_asset(stored_path, path)
+    else:
+        os.remove(path)
+    return stored_path
+
+def add_project_asset(project_dir, path, keep=True, name=None):
+    name = name or os.path.basename(path)
+    dest_path = os.path.join(project_dir, name)
+    stored_path = store_asset(path, keep=keep, link_to=dest_path)
+
+    manifest_path = os.path.join(project_dir, MANIFEST_FILE)
+    manifest = read_json(manifest_path) if os.path.exists(manifest_path) else {'project': os.path.basename(project_dir), 'assets': {}}
+    manifest['assets'][name] = os.path.basename(stored_path)
+    write_json(manifest_path, manifest)
+    return dest_path
+
+def project_dirs():
+    return [os.path.join('PROJECTS', p) for p in sorted(os.listdir('PROJECTS'))
+            if os.path.isdir(os.path.join('PROJECTS', p)) and os.path.join('PROJECTS', p) != QUEUE_DIR]
+
+def migrate_assets():
+    # One-time import of media created before the blob store existed
+    imported = 0
+    for project_dir in project_dirs():
+        for filename in sorted(os.listdir(project_dir)):
+            path = os.path.join(project_dir, filename)
+            if filename == MANIFEST_FILE or filename.endswith('.tmp') or not os.path.isfile(path):
+                continue
+            add_project_asset(project_dir, path)
+            imported += 1
+    for folder in ['IMAGES', 'DIALOGS']:
+        for filename in sorted(os.listdir(folder)):
+            path = os.path.join(folder, filename)
+            if os.path.isfile(path) and not filename.endswith('.tmp'):
+                store_asset(path)
+                imported += 1
+    print(f"Imported {imported} files into {BLOBS_DIR}")
+    return imported
+
+def backup_projects():
+    # Snapshots only copy manifests; the media they reference stays in the blob store
+    timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+    snapshot_paths = []
+    for project_dir in project_dirs():
+        project = os.path.basename(project_dir)
+        manifest_path = os.path.join(project_dir, MANIFEST_FILE)
+        if not os.path.exists(manifest_path):
+            print(f"Skipping {project}: no {MANIFEST_FILE}; run python VIDSTORIES.py --migrate first")
+            continue
+        snapshot_path = os.path.join('BACKUPS', f"{project}_{timestamp}.json")
+        shutil.copy(manifest_path, snapshot_path)
+        snapshot_paths.append(snapshot_path)
+    return snapshot_paths
+
+def restore_backup(snapshot_path):
+    manifest = read_json(snapshot_path)
+    project_dir = os.path.join('PROJECTS', manifest['project'])
+    os.makedirs(project_dir, exist_ok=True)
+    for filename, blob_name in manifest['assets'].items():
+        link_asset(blob_path(blob_name), os.path.join(project_dir, filename))
+    write_json(os.path.join(project_dir, MANIFEST_FILE), manifest)
+    return project_dir
+
+def collect_garbage():
+    referenced = set()
+    manifest_paths = [os.path.join(p, MANIFEST_FILE) for p in project_dirs()]
+    manifest_paths += [os.path.join('BACKUPS', f) for f in os.listdir('BACKUPS') if f.endswith('.json')]
+    for manifest_path in manifest_paths:
+        if not os.path.exists(manifest_path):
+            continue
+        try:
+            referenced.update(read_json(manifest_path)['assets'].values())
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            print(f"Skipping {manifest_path}: not a valid manifest")
+
+    removed, freed = 0, 0
+    for prefix in os.listdir(BLOBS_DIR):
+        prefix_dir = os.path.join(BLOBS_DIR, prefix)
+        if not os.path.isdir(prefix_dir):
+            continue
+        for blob_name in os.listdir(prefix_dir):
+            stored_path = os.path.join(prefix_dir, blob_name)
+            # Half-finished links from link_asset are not blobs
+            if blob_name.endswith('.tmp') or not os.path.isfile(stored_path):
+                continue
+            stat = os.stat(stored_path)
+            # A link count above one means IMAGES, DIALOGS or a project still uses the bytes
+            if blob_name in referenced or stat.st_nlink > 1:
+                continue
+            os.remove(stored_path)
+            removed += 1
+            freed += stat.st_size
+    print(f"Removed {removed} unreferenced blobs, freed {freed / (1024 * 1024):.1f} MB")
+    return removed, freed
+
+def job_path(state, job_id):
+    return os.path.join(QUEUE_DIR, state, f"{job_id}.json")
+
+def write_json(path, data):
+    # Write to a temp file first so readers never see a half-written file
+    temp_path = f"{path}.{uuid.uuid4()}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.replace(temp_path, path)
+
+def read_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def submit_job(kind, payload):
+    job_id = f"{datetime.datetime.now().strftime('%Y%m%d%H%M%S')}_{uuid.uuid4().hex[:8]}"
+    job = {'id': job_id, 'kind': kind, 'payload': payload, 'attempts': 0,
+           'submitted': datetime.datetime.now().isoformat()}
+    write_json(job_path('pending', job_id), job)
+    return job_id
+
+def lease_path(job_id, worker_id):
+    # Each claim gets a worker-specific file, so a worker that lost its lease cannot touch a newer claim
+    return os.path.join(QUEUE_DIR, 'claimed', f"{job_id}.{worker_id}.json")
+
+def get_job_status(job_id):
+    for state in QUEUE_STATES:
+        if state == 'claimed':
+            # Lease files, plus jobs caught halfway through release_job
+            claimed_dir = os.path.join(QUEUE_DIR, 'claimed')
+            paths = [os.path.join(claimed_dir, f) for f in os.listdir(claimed_dir)
+                     if f.startswith(f"{job_id}.") and f.endswith(('.json', '.releasing'))]
+        else:
+            paths = [job_path(state, job_id)]
+        for path in paths:
+            if os.path.exists(path):
+                try:
+                    return state, read_json(path)
+                except (OSError, ValueError):
+                    # The job moved between exists() and open(); try again on the next poll
+                    return state, {}
+    return None, None
+
+def rename_with_retry(source_path, dest_path, attempts=5):
+    # On Windows a rename fails while another process (e.g. the GUI polling status) has the file open
+    for attempt in range(attempts):
+        try:
+            os.rename(source_path, dest_path)
+            return
+        except FileNotFoundError:
+            raise
+        except OSError:
+            if attempt == attempts - 1:
+                raise
+            time.sleep(0.5)
+
+def claim_job(worker_id):
+    pending_dir = os.path.join(QUEUE_DIR, 'pending')
+    for filename in sorted(f for f in os.listdir(pending_dir) if f.endswith('.json')):
+        job_id = filename[:-len('.json')]
+        claimed_path = lease_path(job_id, worker_id)
+        try:
+            # rename is atomic, so only one worker can win a given job
+            os.rename(os.path.join(pending_dir, filename), claimed_path)
+            # rename keeps the old mtime, so start the lease now before anyone sees it as stale
+            os.utime(claimed_path)
+        except OSError:
+            continue
+        try:
+            # Update the lease in place: if it was recovered meanwhile, opening fails instead of recreating it
+            with open(claimed_path, 'r+', encoding='utf-8') as f:
+                job = json.load(f)
+                job.pop('state', None)
+                job['worker'] = worker_id
+                job['attempts'] = job.get('attempts', 0) + 1
+                job['claimed'] = datetime.datetime.now().isoformat()
+                f.seek(0)
+                json.dump(job, f)
+                f.truncate()
+        except FileNotFoundError:
+            continue
+        except (OSError, ValueError) as e:
+            print(f"Moving unreadable job {job_id} to failed: {e}")
+            try:
+                os.rename(claimed_path, job_path('failed', job_id))
+            except OSError:
+                pass
+            continue
+        return job
+    return None
+
+def release_job(claimed_path, job, state):
+    # Take the lease file away from everyone else first; if it is already gone, someone else owns the job
+    releasing_path = f"{claimed_path}.{uuid.uuid4()}.releasing"
+    try:
+        rename_with_retry(claimed_path, releasing_path)
+    except FileNotFoundError:
+        return False
+    # Record the target state so recover_stale_jobs can finish the move if we die before it
+    job['state'] = state
+    write_json(releasing_path, job)
+    rename_with_retry(releasing_path, job_path(state, job['id']))
+    return True
+
+def finish_job(job, result=None, error=None):
+    if error is not None and job['attempts'] < JOB_MAX_ATTEMPTS:
+        state = 'pending'
+    else:
+        state = 'failed' if error is not None else 'done'
+    job['result'] = result
+    job['error'] = error
+    job['finished'] = datetime.datetime.now().isoformat()
+    return release_job(lease_path(job['id'], job['worker']), job, state)
+
+def recover_stale_jobs():
+    # A claimed job whose lease file has not been touched recently belongs to a dead worker;
+    # a leftover .releasing file belongs to a worker that died while finishing
+    claimed_dir = os.path.join(QUEUE_DIR, 'claimed')
+    now = time.time()
+    for filename in os.listdir(claimed_dir):
+        if not filename.endswith(('.json', '.releasing')):
+            continue
+        claimed_path = os.path.join(claimed_dir, filename)
+        try:
+            if now - os.path.getmtime(claimed_path) < JOB_LEASE_SECONDS:
+                continue
+            job = read_json(claimed_path)
+            if filename.endswith('.releasing') and 'state' in job:
+                state = job['state']
+            else:
+                state = 'failed' if job.get('attempts', 0) >= JOB_MAX_ATTEMPTS else 'pending'
+                job['error'] = f"lease expired on worker {job.get('worker')}"
+            if release_job(claimed_path, job, state):
+                print(f"Recovered stale job {job.get('id')} from {job.get('worker')} -> {state}")
+        except (OSError, ValueError):
+            continue
+
+def heartbeat_job(claimed_path, stop_event, lease_lost):
+    while not stop_event.wait(JOB_LEASE_SECONDS / 4):
+        try:
+            os.utime(claimed_path)
+        except OSError:
+            if not os.path.exists(claimed_path):
+                print(f"Lease file {claimed_path} is gone; another worker has recovered the job")
+                lease_lost.set()
+                return
+
+def run_job(job):
+    payload = job['payload']
+    if job['kind'] == 'story':
+        content = chat_with_gpt(payload['context'], payload['model_name'], payload['persona'])
+        if not content or "I'm sorry, but I can't assist with that." in content:
+            raise RuntimeError("The AI was unable to generate the requested content.")
+        return build_project(content, payload['voice'])
+    if job['kind'] == 'voice':
+        audio_path = generate_audio(payload['text'], payload['voice'], **payload.get('params', {}))
+        save_path = os.path.join("DIALOGS", f"{payload['voice']}_AUDIO_{job['id']}.mp3")
+        store_asset(audio_path, keep=False, link_to=save_path)
+        return save_path
+    raise ValueError(f"Unknown job kind: {job['kind']}")
+
+def run_worker(poll_interval=2):
+    worker_id = f"{socket.gethostname()}-{os.getpid()}"
+    print(f"Worker {worker_id} watching {QUEUE_DIR}")
+    while True:
+        recover_stale_jobs()
+        try:
+            job = claim_job(worker_id)
+        except Exception as e:
+            print(f"Failed to claim a job: {e}")
+            job = None
+        if not job:
+            time.sleep(poll_interval)
+            continue
+
+        print(f"Worker {worker_id} running {job['kind']} job {job['id']} (attempt {job['attempts']})")
+        stop_heartbeat = threading.Event()
+        lease_lost = threading.Event()
+        threading.Thread(target=heartbeat_job, args=(lease_path(job['id'], worker_id), stop_heartbeat, lease_lost),
+                         daemon=True).start()
+        try:
+            result, error = run_job(job), None
+        except Exception as e:
+            result, error = None, str(e)
+        stop_heartbeat.set()
+
+        try:
+            if lease_lost.is_set() or not finish_job(job, result=result, error=error):
+                print(f"Worker {worker_id} lost the lease on job {job['id']}; discarding its result")
+            elif error is not None:
+                print(f"Job {job['id']} failed: {error}")
+            else:
+                print(f"Job {job['id']} done: {result}")
+        except Exception as e:
+            print(f"Failed to record the outcome of job {job['id']}: {e}")
+
 def chat_with_gpt(prompt, model_name, persona):
     messages = [
         {"role": "system", "content": persona},
@@ -599,12 +1033,8 @@ def chat_with_gpt(prompt, model_name, persona):
         print(f"Error: {e}")
         return None
 
-def generate_audio(text, voice, progress_callback=None, **params):
-    print(f"\nGenerating audio using {voice}...")
-
+def generate_audio_chunks(text, voice, progress_callback=None, **params):
     chunks = split_text(text)
-    
-    audio_segments = []
     total_chunks = len(chunks)
     
     for i, chunk in enumerate(chunks, 1):
@@ -624,9 +1054,14 @@ def generate_audio(text, voice, progress_callback=None, **params):
         
         audio_segment = AudioSegment.from_mp3(temp_path)
         audio_segment = modify_voice(audio_segment, **{k: v for k, v in params.items() if k != 'progress_callback'})
-        
-        audio_segments.append(audio_segment)
         os.remove(temp_path)
+        
+        yield audio_segment
+
+def generate_audio(text, voice, progress_callback=None, **params):
+    print(f"\nGenerating audio using {voice}...")
+
+    audio_segments = list(generate_audio_chunks(text, voice, progress_callback=progress_callback, **params))
     
     print("Combining audio segments...")
     combined = sum(audio_segments)
@@ -687,15 +1122,39 @@ def generate_image(prompt):
         file.write(response.content)
     return image_path
 
-def main(use_gui=False):
-    folders = ['AUDIO', 'IMAGES', 'PROJECTS', 'DIALOGS', 'BACKUPS']
+def main(use_gui=False, worker=False, backup=False, gc=False, restore=None, migrate=False):
+    folders = ['AUDIO', 'IMAGES', 'PROJECTS', 'DIALOGS', 'BACKUPS', BLOBS_DIR]
     for folder in folders:
         os.makedirs(folder, exist_ok=True)
-
-    if use_gui:
+    for state in QUEUE_STATES:
+        os.makedirs(os.path.join(QUEUE_DIR, state), exist_ok=True)
+
+    if worker:
+        run_worker()
+    elif backup:
+        for snapshot_path in backup_projects():
+            print(f"Snapshot saved to {snapshot_path}")
+    elif gc:
+        collect_garbage()
+    elif restore:
+        print(f"Restored {restore_backup(restore)}")
+    elif migrate:
+        migrate_assets()
+    elif use_gui:
         root = tk.Tk()
         app = MainGUI(root)
         root.mainloop()
 
 if __name__ == "__main__":
-    main(use_gui=True)
+    if "--worker" in sys.argv:
+        main(worker=True)
+    elif "--backup" in sys.argv:
+        main(backup=True)
+    elif "--gc" in sys.argv:
+        main(gc=True)
+    elif "--restore" in sys.argv and sys.argv.index("--restore") + 1 < len(sys.argv):
+        main(restore=sys.argv[sys.argv.index("--restore") + 1])
+    elif "--migrate" in sys.argv:
+        main(migrate=True)
+    else:
+        main(use_gui=True)